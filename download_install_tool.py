@@ -1,21 +1,187 @@
 import os
+import atexit
+import importlib.util
+import re
+import shlex
+import queue
+import shutil
+import threading
+import uuid
+from collections import defaultdict
+from urllib.parse import urlparse
 import requests
 import pandas as pd
 import subprocess
-from tqdm import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from concurrent.futures import ThreadPoolExecutor
 from rich.text import Text
 from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, DownloadColumn, TransferSpeedColumn
 
 console = Console()
 
+# 下载时每次读写的块大小(128 KiB)，过小的块会让 Python 层的循环开销占满下载时间
+CHUNK_SIZE = 128 * 1024
+
+# 所有下载线程共用一个 Session，复用连接池中的长连接，避免每个文件都重新做 TCP/TLS 握手；
+# 下载线程数与连接池大小一致，线程在等待网络时会释放 GIL
+DOWNLOAD_WORKERS = 16
+
+# 服务器返回 429/503 时按 Retry-After 等待，但最多等 RETRY_AFTER_MAX 秒，
+# 否则 CDN 给出的超长等待会让持有主机信号量的下载线程卡住数小时
+RETRY_AFTER_MAX = 30
+
+class _CappedRetry(Retry):
+    def parse_retry_after(self, retry_after):
+        return min(super().parse_retry_after(retry_after), RETRY_AFTER_MAX)
+
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=DOWNLOAD_WORKERS,
+    pool_maxsize=DOWNLOAD_WORKERS,
+    max_retries=_CappedRetry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# 同一主机同时进行的下载数上限，总并发仍可以分摊到多个主机上，但不会把单个 CDN 打到限流(429/503)
+MAX_DOWNLOADS_PER_HOST = 3
+_HOST_SEMAPHORES = defaultdict(lambda: threading.Semaphore(MAX_DOWNLOADS_PER_HOST))
+_HOST_SEMAPHORES_LOCK = threading.Lock()
+
+def _host_semaphore(url):
+    with _HOST_SEMAPHORES_LOCK:
+        return _HOST_SEMAPHORES[urlparse(url).netloc]
+
+# 可选的 Excel 引擎：fastexcel/calamine(Rust 实现)读取、xlsxwriter 写入，均比 openpyxl 快；
+# fastexcel 解析时会释放 GIL，需要 pyarrow 转换为 DataFrame；
+# 都未安装时用 openpyxl 只读模式读取，未安装 xlsxwriter 时回退到 pandas 默认引擎
+_HAS_FASTEXCEL = bool(importlib.util.find_spec("fastexcel") and importlib.util.find_spec("pyarrow"))
+_EXCEL_READ_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+_EXCEL_WRITE_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else None
+
+# 新建 download.xlsx 时写入的列
+EXCEL_COLUMNS = ['应用名', '下载链接', '下载状态', '安装状态']
+
+def _read_apps_openpyxl(excel_file):
+    """
+    未安装 calamine 时的读取方式：openpyxl 只读模式下按值逐行读取，不构造单元格对象，
+    也不经过 pandas 的整表解析。保留表头中的所有列和中间的空行，写回时不会丢失数据。
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        # 与 pandas 一致，没有表头的列命名为 "Unnamed: <序号>"
+        columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+
+        rows = []
+        for row in ws.iter_rows(min_row=2, max_col=len(columns) or 1, values_only=True):
+            rows.append(list(row) + [None] * (len(columns) - len(row)))
+    finally:
+        wb.close()
+
+    # 与其它引擎一致，只去掉末尾的空行（通常只是带格式的空单元格）
+    while rows and all(value is None for value in rows[-1]):
+        rows.pop()
+
+    return pd.DataFrame(rows, columns=columns)
+
+def read_excel(excel_file):
+    if _HAS_FASTEXCEL:
+        import fastexcel
+        # 只把工具自己的列按字符串读取（空白的状态列无需推断类型），用户的其它列仍由 fastexcel 推断，
+        # 写回时数字、日期等保持原样
+        dtypes = {name: "string" for name in EXCEL_COLUMNS}
+        return fastexcel.read_excel(excel_file).load_sheet(0, dtypes=dtypes).to_pandas()
+    if _EXCEL_READ_ENGINE is None:
+        return _read_apps_openpyxl(excel_file)
+    return pd.read_excel(excel_file, engine=_EXCEL_READ_ENGINE)
+
+def write_excel(df, excel_file):
+    df.to_excel(excel_file, index=False, engine=_EXCEL_WRITE_ENGINE)
+    _write_apps_cache(excel_file, df)
+
+# 只有较大的 Excel 才使用 parquet 缓存：小表格直接解析只需几毫秒，反而比导入 pyarrow 读缓存更快
+APPS_CACHE_MIN_SIZE = 1024 * 1024
+
+def _use_apps_cache(excel_file):
+    return os.path.getsize(excel_file) >= APPS_CACHE_MIN_SIZE
+
+def _apps_cache_paths(excel_file):
+    """
+    返回 Excel 对应的 parquet 缓存文件及其校验文件路径，均位于同目录的 .cache 下。
+    """
+    cache_dir = os.path.join(os.path.dirname(excel_file), ".cache")
+    name = os.path.basename(excel_file)
+    return os.path.join(cache_dir, f"{name}.parquet"), os.path.join(cache_dir, f"{name}.key")
+
+def _apps_cache_key(excel_file):
+    # Excel 的修改时间和大小都没变时认为缓存仍然有效
+    stat = os.stat(excel_file)
+    return f"{stat.st_mtime_ns} {stat.st_size}"
+
+def _write_apps_cache(excel_file, df):
+    if not _use_apps_cache(excel_file):
+        return
+    parquet_file, key_file = _apps_cache_paths(excel_file)
+    try:
+        os.makedirs(os.path.dirname(parquet_file), exist_ok=True)
+        # 先删除校验文件，避免写到一半时留下与 parquet 不匹配的 key
+        if os.path.exists(key_file):
+            os.remove(key_file)
+        df.to_parquet(parquet_file, index=False)
+        with open(key_file, 'w', encoding='utf-8') as f:
+            f.write(_apps_cache_key(excel_file))
+    except Exception:
+        # 缓存只是加速手段（例如未安装 pyarrow 时直接跳过），失败不影响正常流程
+        pass
+
+def _load_apps(excel_file):
+    """
+    读取应用列表：较大的 Excel 自上次解析后未改动时直接读取 parquet 缓存，否则解析 Excel 并刷新缓存。
+    返回以应用名为索引的 DataFrame，按应用名查找和更新都是 O(1)。
+    """
+    parquet_file, key_file = _apps_cache_paths(excel_file)
+    df = None
+    if _use_apps_cache(excel_file):
+        try:
+            with open(key_file, encoding='utf-8') as f:
+                if f.read() == _apps_cache_key(excel_file):
+                    df = pd.read_parquet(parquet_file)
+        except Exception:
+            pass
+
+    if df is None:
+        df = read_excel(excel_file)
+        _write_apps_cache(excel_file, df)
+
+    # 记下表格原有的列顺序，写回时恢复（set_index 会把应用名移出列）
+    columns = list(df.columns)
+    df = df.set_index('应用名')
+    df.attrs['columns'] = columns
+    return df
+
+def start_adb_server():
+    """
+    启动 adb server。在后台线程中调用，使 server 的启动耗时与用户选择菜单的时间重叠。
+    """
+    try:
+        subprocess.run(["adb", "start-server"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        # 未找到 adb 时交给 check_device_online 报错
+        pass
+
 def check_device_online():
     try:
         print("检测设备中...")
 
-        result = subprocess.run(["adb", "devices"], stdout=subprocess.PIPE)
-        devices = result.stdout.decode().splitlines()
-        devices = [line for line in devices if line.endswith("device")]
+        result = subprocess.run(["adb", "devices"], capture_output=True, text=True, check=False)
+        # 跳过首行 "List of devices attached"，只保留状态为 device 的序列号
+        devices = [line.split('\t', 1)[0] for line in result.stdout.splitlines()[1:] if line.endswith("device")]
 
         if len(devices) == 0:
             console.print(Text(f"未检测到设备，请检查设备连接状态后重试", style="bold red"))
@@ -24,79 +190,286 @@ def check_device_online():
             console.print(Text(f"检测到 {len(devices)} 台设备，请确保只连接一台设备后重试", style="bold red"))
             return None
         else:
-            device_id = devices[0].split()[0]
+            device_id = devices[0]
             console.print(Text(f"检测到一台设备：{device_id}", style="bold green"))
             return device_id
     except Exception as e:
         console.print(Text(f"检测设备时出错: {e}", style="bold red"))
         return None
 
-def download_app(app_name, url, download_dir, show_progress=True):
+def download_progress():
+    """
+    创建所有下载线程共用的进度条，由主线程统一刷新，避免每个线程各自向终端重绘。
+    """
+    return Progress(
+        TextColumn("[bright_blue]{task.description}"),
+        BarColumn(),
+        DownloadColumn(binary_units=True),
+        TransferSpeedColumn(),
+        console=console
+    )
+
+def _preallocate(apk_file, offset, length):
+    """
+    预先为文件分配磁盘空间，避免文件按块增长时反复更新元数据，也便于文件系统分配连续区块。
+    """
+    if length <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
     try:
-        print(f"正在下载 {app_name}...")
-        file_path = os.path.join(download_dir, f"{app_name}.apk")
-        
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-
-        total_size = int(response.headers.get('content-length', 0))
-
-        with open(file_path, 'wb') as apk_file:
-            if show_progress:
-                with tqdm(
-                    desc=app_name,
-                    total=total_size,
-                    unit='B',
-                    unit_scale=True,
-                    unit_divisor=1024,
-                    bar_format='\033[94m{l_bar}{bar}\033[0m {n_fmt}/{total_fmt} {unit} {rate_fmt}{postfix}'
-                ) as bar:
-                    for data in response.iter_content(chunk_size=1024):
-                        apk_file.write(data)
-                        bar.update(len(data))
-            else:
-                for data in response.iter_content(chunk_size=1024):
-                    apk_file.write(data)
+        os.posix_fallocate(apk_file.fileno(), offset, length)
+    except OSError:
+        # 文件系统不支持时退而直接设置文件长度
+        apk_file.truncate(offset + length)
 
-        print(f"{app_name} 下载完成, 保存在 {file_path}")
-        return file_path, "下载成功"
+def download_app(app_name, url, download_dir, progress=None):
+    try:
+        console.print(Text(f"正在下载 {app_name}..."))
+        with _host_semaphore(url):
+            file_path = os.path.join(download_dir, f"{app_name}.apk")
+            # 下载过程中写入 .part 文件，完成后再改名，中断后可从已下载的位置续传
+            part_path = f"{file_path}.part"
+
+            # 先用 HEAD 获取文件大小，本地已有完整文件时直接跳过；HEAD 只是优化，失败时照常下载
+            try:
+                head = _SESSION.head(url, allow_redirects=True, timeout=(5, 30))
+                remote_size = int(head.headers.get('content-length', 0)) if head.ok else 0
+            except requests.RequestException:
+                remote_size = 0
+            if remote_size and os.path.exists(file_path) and os.path.getsize(file_path) == remote_size:
+                console.print(Text(f"{app_name} 已存在且大小一致，跳过下载"))
+                return file_path, "下载成功"
+
+            have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if remote_size and have >= remote_size:
+                # 残留的 .part 与服务器文件不一致，重新下载
+                have = 0
+
+            headers = {'Range': f'bytes={have}-'} if have else {}
+            response = _SESSION.get(url, headers=headers, stream=True, timeout=(5, 30))
+            if have and response.status_code == 416:
+                # 残留的 .part 已超出服务器文件范围，重新下载
+                have = 0
+                response = _SESSION.get(url, stream=True, timeout=(5, 30))
+            response.raise_for_status()
+            if response.status_code != 206:
+                # 服务器不支持 Range，只能从头下载
+                have = 0
+
+            total_size = have + int(response.headers.get('content-length', 0))
+
+            with open(part_path, 'r+b' if have else 'wb') as apk_file:
+                apk_file.seek(have)
+                _preallocate(apk_file, have, total_size - have)
+                try:
+                    if progress is not None:
+                        task_id = progress.add_task(app_name, total=total_size or None, completed=have)
+                        for data in response.iter_content(chunk_size=CHUNK_SIZE):
+                            apk_file.write(data)
+                            progress.update(task_id, advance=len(data))
+                    else:
+                        # 无需进度时直接把原始流拷贝到文件，省去逐块迭代
+                        response.raw.decode_content = True
+                        shutil.copyfileobj(response.raw, apk_file, length=CHUNK_SIZE)
+                finally:
+                    # 截掉预分配但未写入的部分，使 .part 的大小始终等于已下载的字节数，便于续传
+                    apk_file.truncate()
+
+            # 服务器返回了未压缩内容的长度时，校验实际收到的字节数，避免把不完整的文件当作下载完成；
+            # 保留 .part，下次可以续传
+            received = os.path.getsize(part_path)
+            identity = response.headers.get('content-encoding', 'identity') == 'identity'
+            if 'content-length' in response.headers and identity and received != total_size:
+                raise OSError(f"下载不完整: 已收到 {received} 字节, 应为 {total_size} 字节")
+
+            os.replace(part_path, file_path)
+            console.print(Text(f"{app_name} 下载完成, 保存在 {file_path}"))
+            return file_path, "下载成功"
     except Exception as e:
-        print(f"下载 {app_name} 失败: {e}")
+        console.print(Text(f"下载 {app_name} 失败: {e}"))
         return None, f"下载失败: {e}"
 
+class _AdbSession:
+    """
+    设备上常驻的 adb shell 进程，命令通过 stdin 写入，避免每次安装都重新启动 adb 客户端。
+    """
+    _SENTINEL = re.compile(r"__DONE_([0-9a-f]+)_(\d+)__(-?\d+)")
+    _REMOTE_DIR = "/data/local/tmp"
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._release()
+            self._proc = subprocess.Popen(
+                ["adb", "-s", self.device_id, "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace"
+            )
+
+    def run_many(self, commands):
+        """
+        在常驻 shell 中一次性写入多条命令，每条命令后跟一个带本次调用标识和序号的结束标记，
+        返回与 commands 一一对应的 [(退出码, 输出), ...]。
+        """
+        with self._lock:
+            self._ensure_started()
+            nonce = uuid.uuid4().hex
+            script = "".join(f"{command}; echo __DONE_{nonce}_{i}__$?\n" for i, command in enumerate(commands))
+            self._proc.stdin.write(script)
+            self._proc.stdin.flush()
+
+            results = []
+            output = []
+            for line in self._proc.stdout:
+                match = self._SENTINEL.search(line)
+                if match is None:
+                    output.append(line)
+                    continue
+                if match.group(1) != nonce or int(match.group(2)) != len(results):
+                    # 之前被中断的调用残留的结束标记，连同它的输出一起丢弃
+                    output = []
+                    continue
+                output.append(line[:match.start()])
+                results.append((int(match.group(3)), "".join(output).strip()))
+                output = []
+                if len(results) == len(commands):
+                    return results
+
+            # 读到 EOF 说明 shell 已退出（例如设备断开）
+            raise subprocess.CalledProcessError(self._proc.wait(), ["adb", "-s", self.device_id, "shell"], "".join(output))
+
+    def run(self, command):
+        """
+        在常驻 shell 中执行一条命令，返回 (退出码, 输出)。
+        """
+        return self.run_many([command])[0]
+
+    def push(self, apk_path):
+        """
+        将 APK 推送到设备临时目录，返回设备上的路径。
+        """
+        remote_path = f"{self._REMOTE_DIR}/{uuid.uuid4().hex}.apk"
+        subprocess.run(["adb", "-s", self.device_id, "push", apk_path, remote_path], check=True, capture_output=True, text=True)
+        return remote_path
+
+    def install_many(self, apk_paths, max_workers=5):
+        """
+        先并行推送所有 APK（USB 传输是瓶颈），再在一次 shell 调用中依次执行 pm install。
+        返回 {apk_path: 异常或 None}，None 表示安装成功。
+        """
+        errors = {}
+        remote_paths = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {apk_path: executor.submit(self.push, apk_path) for apk_path in apk_paths}
+            for apk_path, future in futures.items():
+                try:
+                    remote_paths[apk_path] = future.result()
+                except subprocess.CalledProcessError as e:
+                    errors[apk_path] = e
+
+        if not remote_paths:
+            return errors
+
+        commands = [f"pm install -r {shlex.quote(remote_path)}" for remote_path in remote_paths.values()]
+        try:
+            results = self.run_many(commands)
+        finally:
+            self.run("rm -f " + " ".join(shlex.quote(remote_path) for remote_path in remote_paths.values()))
+
+        for apk_path, command, (code, output) in zip(remote_paths, commands, results):
+            errors[apk_path] = subprocess.CalledProcessError(code, command, output) if code != 0 else None
+        return errors
+
+    def _release(self):
+        # 关闭 shell 的管道并等待进程退出
+        if self._proc is None:
+            return
+        if not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc = None
+
+    def close(self):
+        with self._lock:
+            self._release()
+
+_ADB_SESSIONS = {}
+_ADB_SESSIONS_LOCK = threading.Lock()
+
+def _get_adb_session(device_id):
+    with _ADB_SESSIONS_LOCK:
+        session = _ADB_SESSIONS.get(device_id)
+        if session is None:
+            session = _ADB_SESSIONS[device_id] = _AdbSession(device_id)
+        return session
+
+@atexit.register
+def _close_adb_sessions():
+    with _ADB_SESSIONS_LOCK:
+        for session in _ADB_SESSIONS.values():
+            session.close()
+        _ADB_SESSIONS.clear()
+
+def _install_status(apk_path, error):
+    if error is None:
+        console.print(Text(f"{apk_path} 安装完成"))
+        return "安装成功"
+    # 优先使用 adb/pm 自身的报错信息，例如 INSTALL_FAILED_*
+    detail = (error.stderr or error.output or "").strip() or error
+    console.print(Text(f"安装 {apk_path} 失败: {detail}"))
+    return f"安装失败: {detail}"
+
 def install_app(device_id, apk_path, show_progress=True):
     try:
-        print(f"正在安装 {apk_path}...")
-        subprocess.run(["adb", "-s", device_id, "install", apk_path], check=True)
-        print(f"{apk_path} 安装完成")
-        return "安装成功"
+        console.print(Text(f"正在安装 {apk_path}..."))
+        error = _get_adb_session(device_id).install_many([apk_path])[apk_path]
     except subprocess.CalledProcessError as e:
-        print(f"安装 {apk_path} 失败: {e}")
-        return f"安装失败: {e}"
+        error = e
+    return _install_status(apk_path, error)
     
-def update_excel_status(excel_file, app_name, url, download_status, install_status):
-    # 读取现有的 Excel 文件
-    df = pd.read_excel(excel_file)
-
-    if app_name in df['应用名'].values:
-        # 更新现有行
-        index = df[df['应用名'] == app_name].index[0]
-        df.at[index, '下载状态'] = download_status
-        df.at[index, '安装状态'] = install_status
-    else:
-        # 创建新行并确保它是 DataFrame
-        new_row = pd.DataFrame({
-            '应用名': [app_name], 
-            '下载链接': [url], 
-            '下载状态': [download_status], 
-            '安装状态': [install_status]
-        })
+def save_excel_status(excel_file, df, status_map):
+    """
+    将内存中记录的状态一次性写回 Excel 文件。
+    df: 以应用名为索引的 DataFrame（见 _load_apps）
+    status_map: {应用名: (下载链接, 下载状态, 安装状态)}
+    """
+    columns = df.attrs.get('columns', [])
+
+    # 表中没有的应用先收集起来，最后一次性追加，避免每行 concat 都复制整张表
+    new_rows = []
+    for app_name, (url, download_status, install_status) in status_map.items():
+        if app_name in df.index:
+            # 更新现有行
+            df.at[app_name, '下载状态'] = download_status
+            df.at[app_name, '安装状态'] = install_status
+        else:
+            new_rows.append({
+                '应用名': app_name, 
+                '下载链接': url, 
+                '下载状态': download_status, 
+                '安装状态': install_status
+            })
+
+    if new_rows:
         # 将新行添加到 DataFrame 中
-        df = pd.concat([df, new_row], ignore_index=True)
+        df = pd.concat([df, pd.DataFrame(new_rows).set_index('应用名')])
 
-    # 保存更新后的文件
-    df.to_excel(excel_file, index=False)
-    print(f"已更新 {app_name} 的状态为: {download_status}, {install_status}")
+    # 保存更新后的文件，应用名恢复为普通列并按原有列顺序排列，新增的列放在最后
+    df = df.reset_index()
+    df = df.reindex(columns=columns + [c for c in df.columns if c not in columns])
+    write_excel(df, excel_file)
+    console.print(Text(f"已更新 {len(status_map)} 个应用的状态到 {excel_file}"))
 
 def download_and_install_apps(device_id, download_dir, parallel=True):
     excel_file = os.path.join(download_dir, "download.xlsx")
@@ -104,35 +477,62 @@ def download_and_install_apps(device_id, download_dir, parallel=True):
         print("未找到 download.xlsx 文件")
         return
 
-    df = pd.read_excel(excel_file)
+    df = _load_apps(excel_file)
     
-    total_downloads = len(df)
+    # 直接按列取出应用名和下载链接，避免 iterrows 为每一行构造 Series
+    apps = list(zip(df.index.tolist(), df['下载链接'].tolist()))
+    total_downloads = len(apps)
     download_success = 0
     download_failure = 0
+    # 状态和计数都由多个线程更新，+= 不是原子操作，统一用一把锁保护；全部完成后一次性写回 Excel
+    status_map = {}
+    status_lock = threading.Lock()
 
     total_installs = 0
     install_success = 0
     install_failure = 0
 
-    def process_app(index, row):
-        nonlocal download_success, download_failure, install_success, install_failure, total_installs
+    # 下载完成的 APK 放入队列，由单独的安装线程依次安装，网络下载和 USB 安装得以重叠进行；
+    # adb 对同一设备本来就是串行安装的，一个安装线程就够了
+    install_queue = queue.Queue()
+    downloads_done = object()
+    install_errors = []
+
+    def process_app(app_name, url):
+        nonlocal download_success, download_failure
 
-        app_name = row['应用名']
-        url = row['下载链接']
-        
         # 下载应用
-        apk_path, download_status = download_app(app_name, url, download_dir, show_progress=True)
+        apk_path, download_status = download_app(app_name, url, download_dir, progress=progress)
         
         # 统计下载状态
-        if "成功" in download_status:
-            download_success += 1
-        else:
-            download_failure += 1
+        with status_lock:
+            if "成功" in download_status:
+                download_success += 1
+            else:
+                download_failure += 1
         
-        install_status = "未安装"
-        # 如果下载成功，继续安装应用
+        # 如果下载成功，交给安装线程继续安装应用
         if apk_path:
-            install_status = install_app(device_id, apk_path, show_progress=True)
+            install_queue.put((app_name, url, apk_path, download_status))
+        else:
+            with status_lock:
+                status_map[app_name] = (url, download_status, "未安装")
+
+    def install_worker():
+        nonlocal install_success, install_failure, total_installs
+
+        while True:
+            item = install_queue.get()
+            if item is downloads_done:
+                break
+
+            app_name, url, apk_path, download_status = item
+            try:
+                install_status = install_app(device_id, apk_path, show_progress=True)
+            except Exception as e:
+                # 例如 adb shell 已退出导致写入失败；记录后继续安装队列中剩余的 APK
+                install_status = f"安装失败: {e}"
+                install_errors.append((apk_path, e))
             total_installs += 1
             
             # 统计安装状态
@@ -141,16 +541,32 @@ def download_and_install_apps(device_id, download_dir, parallel=True):
             else:
                 install_failure += 1
 
-        update_excel_status(excel_file, app_name, url, download_status, install_status)
+            with status_lock:
+                status_map[app_name] = (url, download_status, install_status)
 
-    if parallel:
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(process_app, index, row) for index, row in df.iterrows()]
-            for future in futures:
-                future.result()
-    else:
-        for index, row in df.iterrows():
-            process_app(index, row)
+    try:
+        with download_progress() as progress:
+            installer = threading.Thread(target=install_worker, daemon=True)
+            installer.start()
+            try:
+                if parallel:
+                    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+                        futures = [executor.submit(process_app, app_name, url) for app_name, url in apps]
+                        for future in futures:
+                            future.result()
+                else:
+                    for app_name, url in apps:
+                        process_app(app_name, url)
+            finally:
+                # 所有下载都已提交后通知安装线程，等待队列中剩余的 APK 安装完成
+                install_queue.put(downloads_done)
+                installer.join()
+    finally:
+        # 即使中途被 Ctrl+C 打断，也把已完成的状态写回
+        save_excel_status(excel_file, df, status_map)
+
+    for apk_path, e in install_errors:
+        console.print(Text(f"安装 {apk_path} 时出错: {e}", style="bold red"))
 
     # 打印下载和安装结果
     console.print(Text(f"下载完成: 成功 {download_success} 个, 失败 {download_failure} 个, 总计 {total_downloads} 个", style="bold bright_cyan"))
@@ -162,33 +578,42 @@ def install_local_apks(device_id, apk_dir, excel_file, parallel=True):
         print(f"{excel_file} 文件未找到，正在创建...")
         
         # 创建一个初始的 DataFrame
-        df = pd.DataFrame(columns=['应用名', '下载链接', '下载状态', '安装状态'])
+        df = pd.DataFrame(columns=EXCEL_COLUMNS)
         
         # 保存到 Excel 文件
-        df.to_excel(excel_file, index=False)
+        write_excel(df, excel_file)
         print(f"{excel_file} 文件已创建。")
     
-    apk_files = [f for f in os.listdir(apk_dir) if f.endswith(".apk")]
+    # scandir 返回的 DirEntry 自带文件类型和完整路径，无需再逐个 stat/拼接
+    apk_entries = [e for e in os.scandir(apk_dir) if e.is_file() and e.name.endswith(".apk")]
+    apk_files = [e.name for e in apk_entries]
 
     if not apk_files:
         print("当前目录未找到任何 APK 文件")
         return
 
-    df = pd.read_excel(excel_file)
+    df = _load_apps(excel_file)
     
     total_installs = len(apk_files)
     install_success = 0
     install_failure = 0
+    status_map = {}
+
+    # adb 对同一设备的安装本身是串行的，因此只并行推送，安装在一次 shell 调用中批量完成
+    apk_paths = [e.path for e in apk_entries]
+    print(f"正在安装 {total_installs} 个 APK...")
+    try:
+        errors = _get_adb_session(device_id).install_many(apk_paths, max_workers=5 if parallel else 1)
+    except subprocess.CalledProcessError as e:
+        errors = {apk_path: e for apk_path in apk_paths}
 
-    def install_apk(apk_file):
-        nonlocal install_success, install_failure
-        apk_path = os.path.join(apk_dir, apk_file)
-        install_status = install_app(device_id, apk_path, show_progress=True)
+    for apk_file, apk_path in zip(apk_files, apk_paths):
+        install_status = _install_status(apk_path, errors[apk_path])
 
         app_name = os.path.splitext(apk_file)[0]
-        url = df[df['应用名'] == app_name]['下载链接'].values[0] if app_name in df['应用名'].values else "本地安装"
+        url = df.at[app_name, '下载链接'] if app_name in df.index else "本地安装"
 
-        update_excel_status(excel_file, app_name, url, "已下载", install_status)
+        status_map[app_name] = (url, "已下载", install_status)
         
         if "成功" in install_status:
             install_success += 1
@@ -197,14 +622,7 @@ def install_local_apks(device_id, apk_dir, excel_file, parallel=True):
 
         print(f"APK 文件 {apk_file} 的安装状态为: {install_status}")
 
-    if parallel:
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(install_apk, apk_file) for apk_file in apk_files]
-            for future in futures:
-                future.result()
-    else:
-        for apk_file in apk_files:
-            install_apk(apk_file)
+    save_excel_status(excel_file, df, status_map)
 
     # 打印安装结果
     console.print(Text(f"安装完成: 成功 {install_success} 个, 失败 {install_failure} 个, 总计 {total_installs} 个", style="bold bright_cyan"))
@@ -215,38 +633,46 @@ def download_apps(device_id, download_dir, parallel=True):
         print("未找到 download.xlsx 文件")
         return
 
-    df = pd.read_excel(excel_file)
+    df = _load_apps(excel_file)
     
-    total_downloads = len(df)
+    # 直接按列取出应用名和下载链接，避免 iterrows 为每一行构造 Series
+    apps = list(zip(df.index.tolist(), df['下载链接'].tolist()))
+    total_downloads = len(apps)
     download_success = 0
     download_failure = 0
+    # 状态和计数都由多个线程更新，+= 不是原子操作，统一用一把锁保护；全部完成后一次性写回 Excel
+    status_map = {}
+    status_lock = threading.Lock()
 
-    def process_app(index, row):
+    def process_app(app_name, url):
         nonlocal download_success, download_failure
 
-        app_name = row['应用名']
-        url = row['下载链接']
-        
         # 下载应用
-        apk_path, download_status = download_app(app_name, url, download_dir, show_progress=True)
+        apk_path, download_status = download_app(app_name, url, download_dir, progress=progress)
         
         # 统计下载状态
-        if "成功" in download_status:
-            download_success += 1
-        else:
-            download_failure += 1
+        with status_lock:
+            if "成功" in download_status:
+                download_success += 1
+            else:
+                download_failure += 1
 
-        # 更新 Excel 文件，安装状态设置为 "未安装"
-        update_excel_status(excel_file, app_name, url, download_status, "未安装")
+            # 记录状态，安装状态设置为 "未安装"
+            status_map[app_name] = (url, download_status, "未安装")
 
-    if parallel:
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(process_app, index, row) for index, row in df.iterrows()]
-            for future in futures:
-                future.result()
-    else:
-        for index, row in df.iterrows():
-            process_app(index, row)
+    try:
+        with download_progress() as progress:
+            if parallel:
+                with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+                    futures = [executor.submit(process_app, app_name, url) for app_name, url in apps]
+                    for future in futures:
+                        future.result()
+            else:
+                for app_name, url in apps:
+                    process_app(app_name, url)
+    finally:
+        # 即使中途被 Ctrl+C 打断，也把已完成的状态写回
+        save_excel_status(excel_file, df, status_map)
 
     # 打印下载结果
     console.print(Text(f"下载完成: 成功 {download_success} 个, 失败 {download_failure} 个, 总计 {total_downloads} 个", style="bold bright_cyan"))
@@ -255,7 +681,8 @@ def delete_all_apks(current_dir):
     """
     删除当前目录下的所有 APK 文件。
     """
-    apk_files = [f for f in os.listdir(current_dir) if f.endswith('.apk')]
+    apk_entries = [e for e in os.scandir(current_dir) if e.is_file() and e.name.endswith('.apk')]
+    apk_files = [e.name for e in apk_entries]
     
     if not apk_files:
         console.print("当前目录没有 APK 文件。", style="bright_yellow")
@@ -265,12 +692,17 @@ def delete_all_apks(current_dir):
     confirmation = input("确认删除这些文件吗？输入 'y' 确认删除，或输入 'n' 取消删除：").strip().lower()
 
     if confirmation == 'y':
-        for apk in apk_files:
+        def delete_apk(entry):
+            apk = entry.name
             try:
-                os.remove(os.path.join(current_dir, apk))
+                os.unlink(entry.path)
                 console.print(f"已删除文件：{apk}", style="bright_green")
             except Exception as e:
                 console.print(f"删除文件 {apk} 时出错：{e}", style="bright_red")
+
+        # 并行删除，让各文件的元数据 I/O 相互重叠（网络盘/U 盘上尤其明显）
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(delete_apk, apk_entries))
     elif confirmation == 'n':
         console.print("文件删除已取消。", style="bright_yellow")
     else:
@@ -281,6 +713,9 @@ def main():
     
     console.print(f"有需求请联系(wx)：BBKRjdeng", style="bright_green")
 
+    # 用户还在选择菜单时就在后台启动 adb server，之后的 adb devices 可以立即返回
+    threading.Thread(target=start_adb_server, daemon=True).start()
+
     while True:
         console.print(Text("请选择操作：\n1. 下载应用\n2. 安装应用\n3. 下载并安装应用\n4. 删除本目录所有APK\nq. 退出", style="bright_yellow"))
         choice = input("输入选项编号：").strip().lower()
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['python_calamine', 'xlsxwriter'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],